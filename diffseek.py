@@ -9,6 +9,7 @@ import argparse
 import hashlib
 import sys
 from collections import deque
+from itertools import accumulate, groupby
 
 # Word list for generating memorable phrases
 WORDS = [
@@ -22,6 +23,9 @@ WORDS = [
     "emerald", "flame", "garnet", "honey", "ivory", "jade", "knight", "lemon"
 ]
 
+# Word for each possible hash byte value, so derive_phrase is a plain table lookup
+_BYTE_WORDS = [WORDS[b % len(WORDS)] for b in range(256)]
+
 # ANSI color codes
 COLORS = [
     "\033[31m",  # Red
@@ -43,10 +47,38 @@ WHITE = "\033[97m"
 RED = "\033[91m"
 UNDERLINE = "\033[4m"
 
+# Display color for each character state (0=unknown is uncolored)
+STATE_COLORS = {
+    1: WHITE,   # known-good
+    2: ORANGE,  # possible-error
+    3: RED,     # definite-error
+}
+
+
+def hash_bytes(data):
+    """Hash a bytes-like object (bytes, bytearray, memoryview) and return the digest.
+
+    Lets callers that already hold encoded data skip a str.encode() per call.
+    """
+    return hashlib.sha256(data).digest()
+
 
 def hash_string(s):
     """Hash a string and return the digest."""
-    return hashlib.sha256(s.encode()).digest()
+    return hash_bytes(s.encode())
+
+
+def _utf8_offsets(s):
+    """Map each character index of s, plus len(s), to its byte offset in s.encode()."""
+    if s.isascii():
+        return range(len(s) + 1)
+    return list(accumulate((len(c.encode()) for c in s), initial=0))
+
+
+def hash_many(buffers):
+    """Hash several bytes-like objects and return their digests in order."""
+    sha256 = hashlib.sha256
+    return [sha256(buf).digest() for buf in buffers]
 
 
 def derive_phrase(hash_digest, num_words=3):
@@ -56,8 +88,11 @@ def derive_phrase(hash_digest, num_words=3):
         hash_digest: The hash to derive from
         num_words: Number of words to include in the phrase (default 3)
     """
-    words = [WORDS[hash_digest[i % len(hash_digest)] % len(WORDS)] for i in range(num_words)]
-    return "-".join(words)
+    num_words = max(num_words, 0)
+    if num_words > len(hash_digest):
+        # Cycle through the hash bytes when more words are requested than it has
+        hash_digest = hash_digest * (num_words // len(hash_digest) + 1)
+    return "-".join(map(_BYTE_WORDS.__getitem__, hash_digest[:num_words]))
 
 
 def derive_color(hash_digest):
@@ -67,8 +102,13 @@ def derive_color(hash_digest):
 
 
 def display_identifiers(s, label="", num_words=3):
-    """Display hash-derived identifiers for a string."""
-    h = hash_string(s)
+    """Display hash-derived identifiers for a string or already-encoded bytes."""
+    h = hash_string(s) if isinstance(s, str) else hash_bytes(s)
+    display_digest(h, label, num_words)
+
+
+def display_digest(h, label="", num_words=3):
+    """Display identifiers derived from an already-computed hash."""
     phrase = derive_phrase(h, num_words)
     color = derive_color(h)
 
@@ -80,15 +120,24 @@ def display_identifiers(s, label="", num_words=3):
 class DiffState:
     """Tracks the state of the binary search diff process."""
 
+    # Fixed attribute layout: no per-instance dict, faster attribute access in the search loop
+    __slots__ = (
+        "user_string", "target_length", "use_dfs",
+        "char_states", "ranges_to_check", "_encoded", "_offsets",
+    )
+
     def __init__(self, user_string, target_length, use_dfs=False):
         self.user_string = user_string
         self.target_length = target_length
         self.use_dfs = use_dfs
         # Track character states: 0=unknown, 1=known-good, 2=possible-error, 3=definite-error
-        self.char_states = [0] * target_length
+        self.char_states = bytearray(max(target_length, 0))
         # Queue of ranges to check: (start, end)
         self.ranges_to_check = deque()
         self.ranges_to_check.append((0, target_length))
+        # Encode once so ranges are hashed as slices of a single buffer
+        self._encoded = memoryview(user_string.encode())
+        self._offsets = _utf8_offsets(user_string)
 
     def display_string(self, current_range=None):
         """Display the user string with color coding.
@@ -103,30 +152,25 @@ class DiffState:
         # Extend or truncate display based on target length
         display_len = min(len(self.user_string), self.target_length)
 
+        # Emit one color code per run of characters sharing a state
+        range_start, range_end = current_range if current_range else (0, 0)
         result = []
-        for i in range(display_len):
-            char = self.user_string[i]
-            state = self.char_states[i]
-
-            # Check if this character is in the current testing range
-            in_current_range = current_range and current_range[0] <= i < current_range[1]
-
-            if state == 1:  # known-good
-                color = WHITE
-            elif state == 2:  # possible-error
-                color = ORANGE
-            elif state == 3:  # definite-error
-                color = RED
-            else:  # unknown
-                color = ""
+        pos = 0
+        runs = groupby(range(display_len),
+                       key=lambda i: (self.char_states[i], range_start <= i < range_end))
+        for (state, in_current_range), run in runs:
+            run_end = pos + sum(1 for _ in run)
+            chunk = self.user_string[pos:run_end]
+            pos = run_end
+            color = STATE_COLORS.get(state, "")
 
             # Apply underline if in current range
             if in_current_range:
-                result.append(f"{UNDERLINE}{color}{char}{RESET}")
+                result.append(f"{UNDERLINE}{color}{chunk}{RESET}")
             elif color:
-                result.append(f"{color}{char}{RESET}")
+                result.append(f"{color}{chunk}{RESET}")
             else:
-                result.append(char)
+                result.append(chunk)
 
         print("".join(result))
 
@@ -135,18 +179,23 @@ class DiffState:
             missing = self.target_length - len(self.user_string)
             print(f"{RED}[{missing} characters missing]{RESET}")
 
-    def mark_range(self, start, end, matches):
-        """Mark a range as matching or not matching."""
+    def mark_range(self, start, end, matches, left_matches=None, right_matches=None):
+        """Mark a range as matching or not matching.
+
+        Args:
+            start: Start of the range (inclusive)
+            end: End of the range (exclusive)
+            matches: Whether the range matched
+            left_matches: Optional result for the left half, if the caller already compared it
+            right_matches: Optional result for the right half, if the caller already compared it
+        """
+        end_clipped = min(end, len(self.char_states))
         if matches:
             # Mark as known-good
-            for i in range(start, end):
-                if i < len(self.char_states):
-                    self.char_states[i] = 1
+            self.char_states[start:end_clipped] = b"\x01" * (end_clipped - start)
         else:
             # Mark as possible-error
-            for i in range(start, end):
-                if i < len(self.char_states):
-                    self.char_states[i] = 2
+            self.char_states[start:end_clipped] = b"\x02" * (end_clipped - start)
 
             # If it's a single character, mark as definite-error
             if end - start == 1:
@@ -155,8 +204,21 @@ class DiffState:
             else:
                 # Split range and add to queue
                 mid = (start + end) // 2
-                self.ranges_to_check.append((start, mid))
-                self.ranges_to_check.append((mid, end))
+                if left_matches is None and right_matches is None:
+                    self.ranges_to_check.extend(((start, mid), (mid, end)))
+                else:
+                    # Halves the caller already compared are resolved now instead of queued
+                    halves = (((start, mid), left_matches), ((mid, end), right_matches))
+                    for (half_start, half_end), half_matches in halves:
+                        if half_matches is None:
+                            self.ranges_to_check.append((half_start, half_end))
+                        else:
+                            self.mark_range(half_start, half_end, half_matches)
+
+    def is_known_good(self, start, end):
+        """Check if every tracked character in [start, end) is known-good."""
+        end = min(end, len(self.char_states))
+        return self.char_states.count(1, start, end) == max(end - start, 0)
 
     def has_work(self):
         """Check if there are more ranges to check."""
@@ -169,6 +231,31 @@ class DiffState:
         else:
             return self.ranges_to_check.popleft()
 
+    def _byte_slice(self, start, end):
+        """Get the encoded bytes of user_string[start:end] without copying."""
+        # Clamp the same way str slicing does
+        lo = min(start, len(self.user_string))
+        hi = max(min(end, len(self.user_string)), lo)
+        return self._encoded[self._offsets[lo]:self._offsets[hi]]
+
+    def _hash_slice(self, start, end):
+        """Hash user_string[start:end]; equal to hash_string on the sliced string."""
+        return hash_bytes(self._byte_slice(start, end))
+
+    def iter_pending_ranges(self):
+        """Yield queued ranges in search order, skipping any that are already known-good.
+
+        Ranges queued by mark_range while iterating are picked up as well.
+        """
+        while self.has_work():
+            start, end = self.next_range()
+            if not self.is_known_good(start, end):
+                yield start, end
+
+    def hash_ranges(self, ranges):
+        """Hash several (start, end) ranges of user_string in one batch."""
+        return hash_many([self._byte_slice(start, end) for start, end in ranges])
+
 
 def run_diff_mode(user_string):
     """Run the binary search diff mode."""
@@ -196,9 +283,11 @@ def run_diff_mode(user_string):
         use_dfs = True
 
     state = DiffState(user_string, target_length, use_dfs)
+    pending = state.iter_pending_ranges()
 
     while True:
-        if not state.has_work():
+        current_range = next(pending, None)
+        if current_range is None:
             print("\n--- Search Complete ---")
             state.display_string()
             print("\nNo more ranges to check.")
@@ -212,15 +301,12 @@ def run_diff_mode(user_string):
                 else:
                     use_dfs = True
                 state = DiffState(user_string, target_length, use_dfs)
+                pending = state.iter_pending_ranges()
                 continue
             else:
                 break
 
-        start, end = state.next_range()
-
-        # Skip ranges that are already known-good
-        if all(state.char_states[i] == 1 for i in range(start, min(end, len(state.char_states)))):
-            continue
+        start, end = current_range
 
         print(f"\n--- Checking characters {start} to {end-1} ---")
 
@@ -228,22 +314,22 @@ def run_diff_mode(user_string):
         state.display_string(current_range=(start, end))
         print()
 
-        # Get substring to check
-        substring = user_string[start:end] if end <= len(user_string) else user_string[start:]
+        # Get hash of the substring to check
+        digest = state._hash_slice(start, end)
 
         # Track phrase length for this range
         phrase_words = 3
-        display_identifiers(substring, f"Range [{start}:{end})", phrase_words)
+        display_digest(digest, f"Range [{start}:{end})", phrase_words)
 
         # Ask if it matches
         while True:
             response = input("Does this match? (y/n/l=longer phrase/r=restart/q=quit): ").strip().lower()
-            if response in ['y', 'n', 'r', 'q']:
+            if response in {'y', 'n', 'r', 'q'}:
                 break
             elif response == 'l':
                 # Generate longer phrase
                 phrase_words += 3
-                display_identifiers(substring, f"Range [{start}:{end})", phrase_words)
+                display_digest(digest, f"Range [{start}:{end})", phrase_words)
             else:
                 print("Please enter y, n, l, r, or q")
 
@@ -259,6 +345,7 @@ def run_diff_mode(user_string):
             else:
                 use_dfs = True
             state = DiffState(user_string, target_length, use_dfs)
+            pending = state.iter_pending_ranges()
             continue
 
         matches = (response == 'y')
@@ -1,23 +1,197 @@
 #!/usr/bin/env python3
 """
 Unit tests for diffseek
+
+Tests share no mutable state: diffseek keeps no module-level caches,
+randomness comes from local Random instances, and sys.argv and
+builtins.input are restored by their fixtures. The file can
+therefore be split across workers with pytest-xdist (pytest -n auto), where
+each test id, including each parametrize case, is its own work unit.
 """
 
+import contextlib
+import functools
+import io
+import operator
+import random
+import re
 import sys
+from itertools import accumulate, compress, count
+
 import pytest
-from unittest.mock import patch, MagicMock
 from diffseek import (
-    DiffState, hash_string, derive_phrase, derive_color, WORDS,
-    display_identifiers, run_diff_mode, main
+    DiffState, hash_bytes, hash_string, hash_many, derive_phrase, derive_color, WORDS,
+    display_identifiers, run_diff_mode, main, COLORS, RED, RESET, UNDERLINE, WHITE
 )
 
+# Set view of the word list for constant-time membership checks
+WORDS_SET = frozenset(WORDS)
+
+# Expected char_states for a 5-character state that is entirely one state
+_ALL_UNKNOWN_5 = bytes(5)
+_ALL_GOOD_5 = b"\x01" * 5
+_ALL_POSSIBLE_5 = b"\x02" * 5
+
+# Matches ANSI color/style escape sequences
+_ANSI_RE = re.compile(r'\033\[[0-9;]*m')
+
+# Captures the phrase printed after an identifier's color block
+_PHRASE_RE = re.compile(r'█████(?:\033\[[0-9;]*m)* (\S+)')
+
+
+def _substring_hasher(s):
+    """Return a memoized hash of s[start:end] that encodes s only once.
+
+    The offset table is built here rather than taken from DiffState, so the
+    oracle does not share the slicing code under test.
+    """
+    encoded = memoryview(s.encode())
+    offsets = list(accumulate((len(c.encode()) for c in s), initial=0))
+
+    @functools.lru_cache(maxsize=None)
+    def hash_substring(start, end):
+        # Clamp the same way str slicing does
+        lo = min(start, len(s))
+        hi = max(min(end, len(s)), lo)
+        return hash_bytes(encoded[offsets[lo]:offsets[hi]])
+    return hash_substring
+
+
+def _drive_search(state, ranges_match, check_halves=False):
+    """Run a search to completion, answering each range with ranges_match(start, end).
+
+    With check_halves, both halves of a mismatched range are compared up front
+    and passed to mark_range. Returns the number of ranges checked.
+    """
+    steps = 0
+    while state.has_work():
+        start, end = state.next_range()
+        steps += 1
+        matches = ranges_match(start, end)
+        if check_halves and not matches and end - start > 1:
+            mid = (start + end) // 2
+            state.mark_range(start, end, matches, ranges_match(start, mid), ranges_match(mid, end))
+        else:
+            state.mark_range(start, end, matches)
+    return steps
+
+
+def _definite_errors(state, limit):
+    """Indices below limit marked definite-error (state 3)."""
+    errors = []
+    # bytearray.find scans in C, so only the errors themselves cost a Python step
+    i = state.char_states.find(3, 0, limit)
+    while i != -1:
+        errors.append(i)
+        i = state.char_states.find(3, i + 1, limit)
+    return errors
+
+
+def _differing_positions(a, b):
+    """Indices where a and b both have characters and those characters differ."""
+    # map/compress keep the per-character comparison out of the interpreter loop
+    return list(compress(count(), map(operator.ne, a, b)))
+
+
+@pytest.fixture(scope="session")
+def h_test():
+    """Digest of "test", shared by the derive_* tests (bytes are immutable)."""
+    return hash_string("test")
+
+
+@pytest.fixture
+def state():
+    """A new DiffState for "hello" with a matching target length."""
+    return DiffState("hello", 5)
+
+
+def _count_exactly_one(haystack, needle):
+    """Check that needle occurs exactly once, stopping at the second occurrence."""
+    first = haystack.find(needle)
+    return first != -1 and haystack.find(needle, first + len(needle)) == -1
+
+
+@contextlib.contextmanager
+def captured_stdout():
+    """Capture stdout in a StringIO; lighter than capsys for checks that ignore stderr.
+
+    Output written inside the block never reaches pytest's own capture, so
+    there is nothing left for that layer to buffer or read back.
+    """
+    with contextlib.redirect_stdout(io.StringIO()) as buf:
+        yield buf
+
+
+def printed(func, *args, **kwargs):
+    """Call func and return what it printed, read back from the buffer exactly once."""
+    with captured_stdout() as buf:
+        func(*args, **kwargs)
+    return buf.getvalue()
+
+
+@pytest.fixture(scope="class")
+def bare_argv():
+    """Run a whole test class as a plain `diffseek` invocation with no arguments."""
+    old_argv = sys.argv
+    sys.argv = ['diffseek']
+    try:
+        yield
+    finally:
+        sys.argv = old_argv
+
+
+@pytest.fixture
+def fake_input(monkeypatch):
+    """Script builtins.input with a plain iterator rather than a mock.
+
+    Like a mock side_effect, exception classes or instances in inputs are raised.
+    """
+    def make(inputs):
+        responses = iter(inputs)
+
+        def scripted_input(prompt=""):
+            response = next(responses)
+            if isinstance(response, BaseException) or (
+                    isinstance(response, type) and issubclass(response, BaseException)):
+                raise response
+            return response
+
+        monkeypatch.setattr('builtins.input', scripted_input)
+    return make
+
+
+def _padded_inputs(inputs, pad="q"):
+    """Yield the scripted inputs, then pad forever; "q" ends every prompt in diffseek."""
+    yield from inputs
+    while True:
+        yield pad
+
+
+@pytest.fixture
+def run_main(fake_input):
+    """Run main() against scripted inputs and return everything it printed.
+
+    Inputs are padded so main() returns on its own once the script runs out.
+    """
+    def run(inputs):
+        fake_input(_padded_inputs(inputs))
+        return printed(main)
+    return run
+
 
 class TestHashString:
     """Tests for hash_string function."""
 
-    def test_hash_returns_bytes(self):
-        """Hash should return bytes."""
-        result = hash_string("test")
+    @pytest.mark.parametrize("s", [
+        pytest.param("test", id="ascii"),
+        pytest.param("", id="empty_string"),
+        pytest.param("Hello 世界 🌍", id="unicode_characters"),
+        pytest.param("line1\nline2\ttab\x00null", id="special_characters"),
+        pytest.param("   \t\n  ", id="whitespace_only"),
+    ])
+    def test_hash_returns_32_bytes(self, s):
+        """Hash should return 32 bytes for any input."""
+        result = hash_string(s)
         assert isinstance(result, bytes)
         assert len(result) == 32  # SHA256 produces 32 bytes
 
@@ -26,122 +200,127 @@ class TestHashString:
         s = "hello world"
         assert hash_string(s) == hash_string(s)
 
+    def test_hash_is_sha256(self):
+        """Digest must stay SHA-256 so devices on different versions agree."""
+        assert hash_string("hello world").hex() == (
+            "b94d27b9934d3e08a52e52d7da7dabfac484efe37a5380ee9088f7ace2efcde9"
+        )
+
     def test_hash_different_for_different_inputs(self):
         """Different inputs should produce different hashes."""
         assert hash_string("hello") != hash_string("world")
 
-    def test_hash_empty_string(self):
-        """Should handle empty string."""
-        result = hash_string("")
-        assert isinstance(result, bytes)
-        assert len(result) == 32
 
-    def test_hash_unicode_characters(self):
-        """Should handle Unicode/non-ASCII characters."""
-        result = hash_string("Hello 世界 🌍")
-        assert isinstance(result, bytes)
-        assert len(result) == 32
+class TestHashBytes:
+    """Tests for hash_bytes function."""
 
-    def test_hash_special_characters(self):
-        """Should handle special characters like newlines, tabs, null bytes."""
-        result = hash_string("line1\nline2\ttab\x00null")
-        assert isinstance(result, bytes)
-        assert len(result) == 32
+    def test_matches_hash_string(self):
+        """Hashing encoded bytes should match hashing the string."""
+        s = "Hello 世界 🌍"
+        assert hash_bytes(s.encode()) == hash_string(s)
 
-    def test_hash_whitespace_only(self):
-        """Should handle strings with only whitespace."""
-        result = hash_string("   \t\n  ")
-        assert isinstance(result, bytes)
-        assert len(result) == 32
+    def test_accepts_memoryview_slice(self):
+        """Should hash a memoryview slice without copying it first."""
+        buf = memoryview(b"hello world")
+        assert hash_bytes(buf[6:11]) == hash_string("world")
+
+
+class TestHashMany:
+    """Tests for hash_many function."""
+
+    def test_matches_individual_hashes(self):
+        """Should return the same digests as hashing each buffer separately."""
+        buffers = [b"", b"hello", memoryview(b"hello world")[6:]]
+        assert hash_many(buffers) == [hash_bytes(b) for b in buffers]
+
+    def test_empty_batch(self):
+        """Should return an empty list for no buffers."""
+        assert hash_many([]) == []
 
 
 class TestDerivePhrase:
     """Tests for derive_phrase function."""
 
-    def test_default_num_words(self):
+    def test_default_num_words(self, h_test):
         """Should return 3 words by default."""
-        h = hash_string("test")
-        phrase = derive_phrase(h)
-        assert len(phrase.split("-")) == 3
+        phrase = derive_phrase(h_test)
+        assert phrase.count("-") == 2
 
-    def test_custom_num_words(self):
+    def test_custom_num_words(self, h_test):
         """Should return requested number of words."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=5)
-        assert len(phrase.split("-")) == 5
+        phrase = derive_phrase(h_test, num_words=5)
+        assert phrase.count("-") == 4
 
-    def test_words_from_list(self):
+    def test_words_from_list(self, h_test):
         """All words should be from WORDS list."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=10)
+        phrase = derive_phrase(h_test, num_words=10)
         words = phrase.split("-")
         for word in words:
-            assert word in WORDS
+            assert word in WORDS_SET
 
-    def test_consistency(self):
+    def test_consistency(self, h_test):
         """Same hash should produce same phrase."""
-        h = hash_string("test")
-        assert derive_phrase(h) == derive_phrase(h)
+        assert derive_phrase(h_test) == derive_phrase(h_test)
 
-    def test_zero_words(self):
+    def test_zero_words(self, h_test):
         """Should handle zero words (empty phrase)."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=0)
+        phrase = derive_phrase(h_test, num_words=0)
         assert phrase == ""
 
-    def test_single_word(self):
+    def test_single_word(self, h_test):
         """Should return single word without hyphen."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=1)
+        phrase = derive_phrase(h_test, num_words=1)
         assert "-" not in phrase
-        assert phrase in WORDS
+        assert phrase in WORDS_SET
 
-    def test_negative_num_words(self):
+    def test_negative_num_words(self, h_test):
         """Should handle negative num_words gracefully."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=-1)
+        phrase = derive_phrase(h_test, num_words=-1)
         assert phrase == ""
 
-    def test_large_num_words(self):
+    def test_large_num_words(self, h_test):
         """Should handle num_words exceeding hash length."""
-        h = hash_string("test")
-        phrase = derive_phrase(h, num_words=100)
+        phrase = derive_phrase(h_test, num_words=100)
         words = phrase.split("-")
         assert len(words) == 100
         for word in words:
-            assert word in WORDS
+            assert word in WORDS_SET
+
+    def test_known_phrase(self):
+        """Phrases must stay stable across versions for cross-device comparison."""
+        h = hash_string("hello world")
+        assert derive_phrase(h, num_words=6) == "flame-november-nebula-flame-tango-november"
+
+    def test_words_follow_hash_bytes(self, h_test):
+        """Word i should be chosen by hash byte i, wrapping past the end of the hash."""
+        words = derive_phrase(h_test, num_words=40).split("-")
+        assert words == [WORDS[h_test[i % len(h_test)] % len(WORDS)] for i in range(40)]
 
 
 class TestDeriveColor:
     """Tests for derive_color function."""
 
-    def test_returns_ansi_code(self):
+    def test_returns_ansi_code(self, h_test):
         """Should return an ANSI color code."""
-        h = hash_string("test")
-        color = derive_color(h)
+        color = derive_color(h_test)
         assert color.startswith("\033[")
 
-    def test_consistency(self):
+    def test_consistency(self, h_test):
         """Same hash should produce same color."""
-        h = hash_string("test")
-        assert derive_color(h) == derive_color(h)
+        assert derive_color(h_test) == derive_color(h_test)
 
     def test_first_color(self):
         """Should handle hash that maps to first color."""
         # Create a hash where byte at index 3 is 0
-        h = bytearray(32)
-        h[3] = 0
-        color = derive_color(bytes(h))
-        from diffseek import COLORS
+        h = bytes(32)
+        color = derive_color(h)
         assert color == COLORS[0]
 
     def test_last_color(self):
         """Should handle hash that maps to last color."""
-        from diffseek import COLORS
         # Create a hash where byte at index 3 maps to last color
-        h = bytearray(32)
-        h[3] = len(COLORS) - 1
-        color = derive_color(bytes(h))
+        h = bytes([0, 0, 0, len(COLORS) - 1]) + bytes(28)
+        color = derive_color(h)
         assert color == COLORS[len(COLORS) - 1]
 
 
@@ -155,16 +334,15 @@ class TestDiffStateInit:
         assert state.target_length == 5
         assert state.use_dfs is False
         assert len(state.char_states) == 5
-        assert all(s == 0 for s in state.char_states)
+        assert state.char_states == _ALL_UNKNOWN_5
 
     def test_init_with_dfs(self):
         """Should initialize with DFS mode."""
         state = DiffState("test", 4, use_dfs=True)
         assert state.use_dfs is True
 
-    def test_initial_range(self):
+    def test_initial_range(self, state):
         """Should have initial range covering full string."""
-        state = DiffState("hello", 5)
         assert state.has_work()
         assert state.next_range() == (0, 5)
 
@@ -184,7 +362,7 @@ class TestDiffStateInit:
         """Should handle negative target_length."""
         state = DiffState("hello", -5)
         assert state.target_length == -5
-        # Python allows negative list sizes, but they create empty lists
+        # Negative lengths are clamped to an empty state array
         assert len(state.char_states) == 0
 
     def test_init_empty_string_nonzero_target(self):
@@ -198,29 +376,25 @@ class TestDiffStateInit:
 class TestDiffStateMarkRange:
     """Tests for DiffState.mark_range method."""
 
-    def test_mark_matching_range(self):
+    def test_mark_matching_range(self, state):
         """Should mark matching range as known-good (state 1)."""
-        state = DiffState("hello", 5)
         state.mark_range(0, 5, matches=True)
-        assert all(s == 1 for s in state.char_states)
+        assert state.char_states == _ALL_GOOD_5
 
-    def test_mark_non_matching_range(self):
+    def test_mark_non_matching_range(self, state):
         """Should mark non-matching range as possible-error (state 2)."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()  # Clear initial range
         state.mark_range(0, 5, matches=False)
-        assert all(s == 2 for s in state.char_states)
+        assert state.char_states == _ALL_POSSIBLE_5
 
-    def test_mark_single_char_mismatch(self):
+    def test_mark_single_char_mismatch(self, state):
         """Should mark single character mismatch as definite-error (state 3)."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         state.mark_range(2, 3, matches=False)
         assert state.char_states[2] == 3
 
-    def test_split_non_matching_range(self):
+    def test_split_non_matching_range(self, state):
         """Should split non-matching range into two subranges."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         state.mark_range(0, 4, matches=False)
         # Should add two ranges: (0, 2) and (2, 4)
@@ -228,9 +402,28 @@ class TestDiffStateMarkRange:
         assert (0, 2) in state.ranges_to_check
         assert (2, 4) in state.ranges_to_check
 
-    def test_mark_range_start_equals_end(self):
+    def test_mark_with_matching_half(self, state):
+        """A half known to match should be marked good instead of queued."""
+        state.ranges_to_check.clear()
+        state.mark_range(0, 4, matches=False, left_matches=True, right_matches=False)
+        assert list(state.char_states) == [1, 1, 2, 2, 0]
+        assert list(state.ranges_to_check) == [(2, 3), (3, 4)]
+
+    def test_mark_with_single_char_half(self, state):
+        """A width-1 half known to mismatch should be marked definite-error."""
+        state.ranges_to_check.clear()
+        state.mark_range(0, 2, matches=False, left_matches=False, right_matches=True)
+        assert list(state.char_states) == [3, 1, 0, 0, 0]
+        assert not state.has_work()
+
+    def test_mark_with_one_half_unknown(self, state):
+        """Only the half without a result should be queued."""
+        state.ranges_to_check.clear()
+        state.mark_range(0, 4, matches=False, left_matches=None, right_matches=True)
+        assert list(state.ranges_to_check) == [(0, 2)]
+
+    def test_mark_range_start_equals_end(self, state):
         """Should handle start == end (empty range)."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         state.mark_range(2, 2, matches=False)
         # Empty range gets split into two empty ranges (current behavior)
@@ -239,46 +432,94 @@ class TestDiffStateMarkRange:
         assert state.ranges_to_check[0] == (2, 2)
         assert state.ranges_to_check[1] == (2, 2)
 
-    def test_mark_range_start_greater_than_end(self):
+    def test_mark_range_partially_out_of_bounds(self, state):
+        """Should only mark the in-bounds part of a range."""
+        state.mark_range(3, 8, matches=False)
+        assert list(state.char_states) == [0, 0, 0, 2, 2]
+
+    def test_mark_range_start_greater_than_end(self, state):
         """Should handle start > end (invalid range)."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         initial_len = len(state.ranges_to_check)
         state.mark_range(4, 2, matches=False)
         # Should handle gracefully (may not add ranges)
         assert len(state.ranges_to_check) >= initial_len
 
-    def test_mark_range_out_of_bounds(self):
+    def test_mark_range_out_of_bounds(self, state):
         """Should handle out-of-bounds indices."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         # Mark range beyond target_length
         state.mark_range(10, 15, matches=True)
-        # Should not crash
+        # Should not crash or grow the state array
+        assert len(state.char_states) == 5
 
-    def test_mark_already_marked_range(self):
+    def test_mark_already_marked_range(self, state):
         """Should handle marking already-marked ranges."""
-        state = DiffState("hello", 5)
         state.mark_range(0, 5, matches=True)
         # Mark same range again
         state.mark_range(0, 5, matches=True)
-        assert all(s == 1 for s in state.char_states)
+        assert state.char_states == _ALL_GOOD_5
 
-    def test_mark_single_char_at_position_zero(self):
+    def test_mark_single_char_at_position_zero(self, state):
         """Should mark single character error at position 0."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         state.mark_range(0, 1, matches=False)
         assert state.char_states[0] == 3  # definite-error
 
-    def test_mark_single_char_at_last_position(self):
+    def test_mark_single_char_at_last_position(self, state):
         """Should mark single character error at last position."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         state.mark_range(4, 5, matches=False)
         assert state.char_states[4] == 3  # definite-error
 
 
+class TestDiffStateIsKnownGood:
+    """Tests for DiffState.is_known_good method."""
+
+    def test_unknown_range(self, state):
+        """Unchecked characters should not count as known-good."""
+        assert not state.is_known_good(0, 5)
+
+    def test_marked_range(self, state):
+        """Should be known-good after a matching range is marked."""
+        state.mark_range(0, 3, matches=True)
+        assert state.is_known_good(0, 3)
+        assert state.is_known_good(1, 2)
+        assert not state.is_known_good(0, 4)
+
+    def test_range_past_target_length(self):
+        """Should only consider characters within target_length."""
+        state = DiffState("hello world", 5)
+        state.mark_range(0, 5, matches=True)
+        assert state.is_known_good(3, 11)
+
+    def test_empty_range(self, state):
+        """Empty ranges have nothing left to check."""
+        assert state.is_known_good(2, 2)
+        assert state.is_known_good(10, 15)
+
+
+class TestDiffStateIterPendingRanges:
+    """Tests for DiffState.iter_pending_ranges method."""
+
+    def test_skips_known_good_ranges(self):
+        """Should only yield ranges that still need checking."""
+        state = DiffState("hello", 5)
+        state.ranges_to_check.clear()
+        state.ranges_to_check.extend([(0, 2), (2, 4), (4, 5)])
+        state.mark_range(2, 4, matches=True)
+        assert list(state.iter_pending_ranges()) == [(0, 2), (4, 5)]
+        assert not state.has_work()
+
+    def test_picks_up_newly_queued_ranges(self):
+        """Ranges split while iterating should be yielded afterwards."""
+        state = DiffState("abcd", 4)
+        pending = state.iter_pending_ranges()
+        assert next(pending) == (0, 4)
+        state.mark_range(0, 4, matches=False)
+        assert list(pending) == [(0, 2), (2, 4)]
+
+
 class TestDiffStateBFS:
     """Tests for DiffState with BFS mode."""
 
@@ -314,87 +555,91 @@ class TestDiffStateDFS:
 class TestDiffStateHasWork:
     """Tests for DiffState.has_work method."""
 
-    def test_has_work_initially(self):
+    def test_has_work_initially(self, state):
         """Should have work initially."""
-        state = DiffState("hello", 5)
         assert state.has_work()
 
-    def test_no_work_when_empty(self):
+    def test_no_work_when_empty(self, state):
         """Should have no work when queue is empty."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         assert not state.has_work()
 
-    def test_next_range_on_empty_queue(self):
+    def test_next_range_on_empty_queue(self, state):
         """Should raise IndexError when calling next_range on empty queue."""
-        state = DiffState("hello", 5)
         state.ranges_to_check.clear()
         with pytest.raises(IndexError):
             state.next_range()
 
 
+class TestDiffStateHashing:
+    """Tests for DiffState range hashing."""
+
+    @pytest.mark.parametrize("s", ["hello world", "Hello 世界 🌍!", ""])
+    def test_hash_slice_matches_hash_string(self, s):
+        """Hashing a slice of the encoded buffer should match hashing the substring."""
+        state = DiffState(s, len(s))
+        for start in range(len(s) + 1):
+            for end in range(start, len(s) + 2):
+                assert state._hash_slice(start, end) == hash_string(s[start:end])
+
+    def test_hash_ranges_batch(self):
+        """Should hash each range in order, matching individual hashes."""
+        state = DiffState("hello world", 11)
+        ranges = [(0, 5), (6, 11), (3, 3), (8, 20)]
+        assert state.hash_ranges(ranges) == [hash_string(s) for s in ("hello", "world", "", "rld")]
+
+
 class TestBinarySearchIntegration:
     """Integration tests for the binary search diff algorithm."""
 
-    def run_search(self, reference_string, user_string, target_length=None, use_dfs=False):
+    def run_search(self, reference_string, user_string, target_length=None, use_dfs=False,
+                   check_halves=False):
         """Helper to run a complete binary search."""
         if target_length is None:
             target_length = len(reference_string)
 
         state = DiffState(user_string, target_length, use_dfs)
-        steps = 0
-
-        while state.has_work():
-            start, end = state.next_range()
-            steps += 1
+        ref_hash = _substring_hasher(reference_string)
+        user_hash = _substring_hasher(user_string)
 
-            # Get substrings to compare
-            ref_substr = reference_string[start:end] if end <= len(reference_string) else reference_string[start:]
-            user_substr = user_string[start:end] if end <= len(user_string) else user_string[start:]
-
-            # Compare hashes
-            matches = hash_string(ref_substr) == hash_string(user_substr)
-            state.mark_range(start, end, matches)
+        # Compare hashes of the substrings
+        steps = _drive_search(state, lambda start, end: ref_hash(start, end) == user_hash(start, end),
+                              check_halves)
 
         # Extract found errors
-        errors_found = [i for i in range(min(len(user_string), target_length))
-                        if state.char_states[i] == 3]
+        errors_found = _definite_errors(state, min(len(user_string), target_length))
 
         # Extract actual errors
-        actual_errors = [i for i in range(min(len(reference_string), len(user_string), target_length))
-                         if reference_string[i] != user_string[i]]
+        actual_errors = _differing_positions(reference_string[:target_length], user_string)
 
         return steps, errors_found, actual_errors
 
-    def test_single_error_bfs(self):
-        """Should find single character error using BFS."""
-        _, errors_found, actual_errors = self.run_search("hello world", "hello warld")
-        assert errors_found == actual_errors
-        assert errors_found == [7]
-
-    def test_single_error_dfs(self):
-        """Should find single character error using DFS."""
-        _, errors_found, actual_errors = self.run_search("hello world", "hello warld", use_dfs=True)
-        assert errors_found == actual_errors
-        assert errors_found == [7]
-
-    def test_multiple_errors_bfs(self):
-        """Should find multiple character errors using BFS."""
-        _, errors_found, actual_errors = self.run_search("abcdefghijklmnop", "abXdefXhijXlmnop")
+    @pytest.mark.parametrize("ref,usr,expected,use_dfs", [
+        pytest.param("hello world", "hello warld", [7], False, id="single_error_bfs"),
+        pytest.param("hello world", "hello warld", [7], True, id="single_error_dfs"),
+        pytest.param("abcdefghijklmnop", "abXdefXhijXlmnop", [2, 6, 10], False, id="multiple_errors_bfs"),
+        pytest.param("abcdefghijklmnop", "abXdefXhijXlmnop", [2, 6, 10], True, id="multiple_errors_dfs"),
+        pytest.param("perfectly matching string", "perfectly matching string", [], False,
+                     id="identical_strings"),
+        pytest.param("https://example.com/auth?token=abc123def456ghi789jkl012mno345pqr678stu901vwx234yz",
+                     "https://example.com/auth?token=abc123def456ghi789jkl012mno345pqr67Xstu901vwx234yZ",
+                     [66, 80], False, id="long_string_with_errors"),
+        pytest.param("aaaaaaaa", "bbbbbbbb", list(range(8)), False, id="all_characters_different"),
+        pytest.param("hello", "Xello", [0], False, id="first_character_only_differs"),
+        pytest.param("hello", "hellX", [4], False, id="last_character_only_differs"),
+        pytest.param("abcdefgh", "abXXXfgh", [2, 3, 4], False, id="consecutive_errors"),
+        pytest.param("a", "a", [], False, id="length_one_matching"),
+        pytest.param("a", "b", [0], False, id="length_one_different"),
+        pytest.param("ab", "Xb", [0], False, id="length_two_different"),
+        pytest.param("Hello 世界", "Hello 世X", [7], False, id="unicode_characters"),
+    ])
+    @pytest.mark.parametrize("check_halves", [False, True])
+    def test_search_finds_expected_errors(self, ref, usr, expected, use_dfs, check_halves):
+        """Should find exactly the differing characters."""
+        _, errors_found, actual_errors = self.run_search(ref, usr, use_dfs=use_dfs,
+                                                         check_halves=check_halves)
         assert errors_found == actual_errors
-        assert errors_found == [2, 6, 10]
-
-    def test_multiple_errors_dfs(self):
-        """Should find multiple character errors using DFS."""
-        _, errors_found, actual_errors = self.run_search("abcdefghijklmnop", "abXdefXhijXlmnop", use_dfs=True)
-        assert errors_found == actual_errors
-        assert errors_found == [2, 6, 10]
-
-    def test_identical_strings(self):
-        """Should find no errors with identical strings."""
-        _, errors_found, actual_errors = self.run_search("perfectly matching string", "perfectly matching string")
-        assert errors_found == actual_errors
-        assert errors_found == []
+        assert errors_found == expected
 
     def test_length_mismatch(self):
         """Should handle strings with different lengths."""
@@ -404,13 +649,6 @@ class TestBinarySearchIntegration:
         # Missing characters are not marked as definite errors
         assert len(errors_found) == len(actual_errors)
 
-    def test_long_string_with_errors(self):
-        """Should handle longer strings with scattered errors."""
-        ref = "https://example.com/auth?token=abc123def456ghi789jkl012mno345pqr678stu901vwx234yz"
-        usr = "https://example.com/auth?token=abc123def456ghi789jkl012mno345pqr67Xstu901vwx234yZ"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-
     def test_dfs_same_or_fewer_steps(self):
         """Should verify DFS and BFS find the same errors."""
         ref = "abcdefghijklmnop"
@@ -427,434 +665,313 @@ class TestBinarySearchIntegration:
         _, errors_dfs, _ = self.run_search(ref, usr, use_dfs=True)
         assert errors_bfs == errors_dfs
 
-    def test_all_characters_different(self):
-        """Should find all errors when all characters differ."""
-        ref = "aaaaaaaa"
-        usr = "bbbbbbbb"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert len(errors_found) == 8
-
-    def test_first_character_only_differs(self):
-        """Should find error when only first character differs."""
-        ref = "hello"
-        usr = "Xello"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == [0]
-
-    def test_last_character_only_differs(self):
-        """Should find error when only last character differs."""
-        ref = "hello"
-        usr = "hellX"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == [4]
-
-    def test_consecutive_errors(self):
-        """Should find consecutive/adjacent errors."""
-        ref = "abcdefgh"
-        usr = "abXXXfgh"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == [2, 3, 4]
-
-    def test_empty_vs_non_empty(self):
-        """Should handle empty string vs non-empty string."""
-        ref = ""
-        usr = "hello"
-        _, errors_found, _ = self.run_search(ref, usr, target_length=5)
-        # Empty reference means all positions where user has chars are errors
-        # But the algorithm only marks definite errors where comparison happens
-        # This is a boundary case
-
-    def test_non_empty_vs_empty(self):
-        """Should handle non-empty string vs empty string."""
-        ref = "hello"
-        usr = ""
-        _, errors_found, _ = self.run_search(ref, usr, target_length=5)
+    @pytest.mark.parametrize("ref,usr,target_length,expected", [
+        pytest.param("", "", 0, [], id="both_empty"),
+        # Every user character mismatches against an empty reference
+        pytest.param("", "hello", 5, [0, 1, 2, 3, 4], id="empty_vs_non_empty"),
         # User string is empty, so no characters to mark as errors
-        assert errors_found == []
-
-    def test_both_empty(self):
-        """Should handle both strings empty."""
-        ref = ""
-        usr = ""
-        _, errors_found, actual_errors = self.run_search(ref, usr, target_length=0)
-        assert errors_found == actual_errors
-        assert errors_found == []
-
-    def test_length_one_matching(self):
-        """Should handle length-1 strings that match."""
-        ref = "a"
-        usr = "a"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == []
-
-    def test_length_one_different(self):
-        """Should handle length-1 strings that differ."""
-        ref = "a"
-        usr = "b"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == [0]
-
-    def test_length_two_different(self):
-        """Should handle length-2 strings with errors."""
-        ref = "ab"
-        usr = "Xb"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
-        assert errors_found == [0]
-
-    def test_unicode_characters(self):
-        """Should handle Unicode characters in strings."""
-        ref = "Hello 世界"
-        usr = "Hello 世X"
-        _, errors_found, actual_errors = self.run_search(ref, usr)
-        assert errors_found == actual_errors
+        pytest.param("hello", "", 5, [], id="non_empty_vs_empty"),
+    ])
+    def test_empty_strings(self, ref, usr, target_length, expected):
+        """Should handle an empty reference and/or user string."""
+        _, errors_found, _ = self.run_search(ref, usr, target_length=target_length)
+        assert errors_found == expected
+
+    @pytest.mark.parametrize("use_dfs", [False, True])
+    def test_each_range_checked_once(self, use_dfs):
+        """No (start, end) range should be queued twice in one search."""
+        state = DiffState("b" * 13, 13, use_dfs)
+        checked = []
+
+        def record(start, end):
+            checked.append((start, end))
+            return False
+
+        _drive_search(state, record)
+        assert len(checked) == len(set(checked)) == 2 * 13 - 1
+
+    @pytest.mark.parametrize("check_halves", [False, True])
+    @pytest.mark.parametrize("use_dfs", [False, True])
+    def test_random_strings_direct_comparison(self, use_dfs, check_halves):
+        """Should find every error across many random transcriptions."""
+        # Compares substrings directly rather than hashing, so many cases stay cheap
+        rng = random.Random(0)
+        for _ in range(200):
+            length = rng.randint(1, 64)
+            ref = "".join(rng.choice("abc") for _ in range(length))
+            usr = "".join(c if rng.random() < 0.9 else "X" for c in ref)
+            state = DiffState(usr, length, use_dfs)
+            _drive_search(state, lambda start, end: ref[start:end] == usr[start:end], check_halves)
+            assert _definite_errors(state, length) == _differing_positions(ref, usr)
 
 
 class TestDisplayIdentifiers:
     """Tests for display_identifiers function."""
 
-    def test_display_with_label(self, capsys):
+    def test_display_with_label(self):
         """Should display hash identifiers with label."""
-        display_identifiers("test string", label="Test")
-        captured = capsys.readouterr()
-        assert "Test:" in captured.out
-        assert "█████" in captured.out
+        out = printed(display_identifiers, "test string", label="Test")
+        assert "Test:" in out
+        assert "█████" in out
         # Check that it contains a phrase (3 words by default)
-        lines = captured.out.strip().split('\n')
+        lines = out.strip().split('\n')
         assert len(lines) == 1
         # Extract the phrase part (after the color block)
-        assert "-" in captured.out  # Phrases are hyphen-separated
+        assert "-" in out  # Phrases are hyphen-separated
 
-    def test_display_without_label(self, capsys):
+    def test_display_without_label(self):
         """Should display hash identifiers without label."""
-        display_identifiers("test string")
-        captured = capsys.readouterr()
-        assert "█████" in captured.out
+        out = printed(display_identifiers, "test string")
+        assert "█████" in out
         # Should not have a label prefix with colon followed by space at the start
         # Check that output doesn't start with a label format like "Label: "
-        first_line = captured.out.strip().split('\n')[0]
+        first_line = out.strip().split('\n')[0]
         # If there's a colon, it shouldn't be followed by the color block (indicating a label)
         assert not first_line.split("█████")[0].strip().endswith(":")
 
-    def test_display_custom_num_words(self, capsys):
+    def test_display_custom_num_words(self):
         """Should display requested number of words."""
-        display_identifiers("test", num_words=5)
-        captured = capsys.readouterr()
-        # Extract the phrase (after the ANSI codes and color block)
+        out = printed(display_identifiers, "test", num_words=5)
+        # Extract the phrase (after the color block and its reset code)
         # Count hyphens - should be num_words - 1
-        phrase_part = captured.out.split("█████")[-1].strip()
-        word_count = len(phrase_part.split("-"))
+        m = _PHRASE_RE.search(out)
+        word_count = m.group(1).count("-") + 1 if m else 0
         assert word_count == 5
 
-    def test_display_consistency(self, capsys):
+    def test_display_consistency(self):
         """Same string should produce same display."""
-        display_identifiers("consistent")
-        output1 = capsys.readouterr().out
-        display_identifiers("consistent")
-        output2 = capsys.readouterr().out
-        assert output1 == output2
+        assert printed(display_identifiers, "consistent") == printed(display_identifiers, "consistent")
+
+    def test_display_encoded_bytes(self):
+        """Encoded bytes should display the same identifiers as the string."""
+        from_str = printed(display_identifiers, "Hello 世界 🌍")
+        from_bytes = printed(display_identifiers, memoryview("Hello 世界 🌍".encode()))
+        assert from_bytes == from_str
 
-    def test_display_empty_string(self, capsys):
+    def test_display_empty_string(self):
         """Should handle empty string input."""
-        display_identifiers("")
-        captured = capsys.readouterr()
-        assert "█████" in captured.out
+        out = printed(display_identifiers, "")
+        assert "█████" in out
 
-    def test_display_zero_words(self, capsys):
+    def test_display_zero_words(self):
         """Should handle zero words."""
-        display_identifiers("test", num_words=0)
-        captured = capsys.readouterr()
-        assert "█████" in captured.out
+        out = printed(display_identifiers, "test", num_words=0)
+        assert "█████" in out
         # No phrase should be displayed
-        lines = captured.out.strip().split('\n')
+        assert _PHRASE_RE.search(out) is None
+        lines = out.strip().split('\n')
         assert len(lines) == 1
 
-    def test_display_unicode(self, capsys):
+    def test_display_unicode(self):
         """Should handle Unicode characters."""
-        display_identifiers("Hello 世界 🌍", label="Unicode")
-        captured = capsys.readouterr()
-        assert "Unicode:" in captured.out
-        assert "█████" in captured.out
+        out = printed(display_identifiers, "Hello 世界 🌍", label="Unicode")
+        assert "Unicode:" in out
+        assert "█████" in out
 
 
 class TestDiffStateDisplay:
     """Tests for DiffState.display_string method."""
 
-    def test_display_empty_string(self, capsys):
+    def test_display_empty_string(self):
         """Should handle empty string."""
         state = DiffState("", 0)
-        state.display_string()
-        captured = capsys.readouterr()
-        assert "(empty string)" in captured.out
+        out = printed(state.display_string)
+        assert "(empty string)" in out
 
-    def test_display_unknown_state(self, capsys):
+    def test_display_unknown_state(self):
         """Should display unknown characters without coloring."""
         state = DiffState("hello", 5)
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should contain the string (though may have ANSI codes)
-        assert "hello" in captured.out or "h" in captured.out
+        assert "hello" in out or "h" in out
 
-    def test_display_known_good(self, capsys):
+    def test_display_known_good(self):
         """Should display known-good characters."""
         state = DiffState("hello", 5)
         state.char_states = [1, 1, 1, 1, 1]  # All known-good
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should contain ANSI codes for white color
-        assert "\033[" in captured.out
-        assert "\033[0m" in captured.out  # Reset code
+        assert "\033[" in out
+        assert "\033[0m" in out  # Reset code
 
-    def test_display_possible_error(self, capsys):
+    def test_display_coalesces_runs(self):
+        """Should emit one color code per run of same-state characters."""
+        state = DiffState("hello", 5)
+        state.char_states = bytearray([1, 1, 3, 1, 1])
+        out = printed(state.display_string)
+        assert out == f"{WHITE}he{RESET}{RED}l{RESET}{WHITE}lo{RESET}\n"
+
+    def test_display_underlines_current_range(self):
+        """Should underline the current range as a single run."""
+        state = DiffState("hello", 5)
+        out = printed(state.display_string, current_range=(1, 4))
+        assert out == f"h{UNDERLINE}ell{RESET}o\n"
+
+    def test_display_possible_error(self):
         """Should display possible-error characters in orange."""
         state = DiffState("hello", 5)
         state.char_states = [2, 2, 2, 2, 2]  # All possible-error
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should contain ANSI codes for orange color
-        assert "\033[" in captured.out
+        assert "\033[" in out
 
-    def test_display_definite_error(self, capsys):
+    def test_display_definite_error(self):
         """Should display definite-error characters in red."""
         state = DiffState("hello", 5)
         state.char_states = [1, 1, 3, 1, 1]  # Middle char is error
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should contain ANSI codes
-        assert "\033[" in captured.out
+        assert "\033[" in out
 
-    def test_display_mixed_states(self, capsys):
+    def test_display_mixed_states(self):
         """Should display mixed character states correctly."""
         state = DiffState("hello", 5)
         state.char_states = [1, 0, 2, 3, 1]  # Mix of all states
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should have output with ANSI codes
-        assert "\033[" in captured.out
+        assert "\033[" in out
 
-    def test_display_string_too_short(self, capsys):
+    def test_display_string_too_short(self):
         """Should indicate when string is shorter than target."""
         state = DiffState("hi", 5)
-        state.display_string()
-        captured = capsys.readouterr()
-        assert "[3 characters missing]" in captured.out
+        out = printed(state.display_string)
+        assert "[3 characters missing]" in out
 
-    def test_display_truncates_to_target_length(self, capsys):
+    def test_display_truncates_to_target_length(self):
         """Should only display up to target length."""
         state = DiffState("hello world", 5)
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should not show " world" part - the output should be limited to first 5 characters
         # Remove ANSI codes to check the actual string content
-        import re
-        ansi_escape = re.compile(r'\033\[[0-9;]*m')
-        clean_output = ansi_escape.sub('', captured.out).strip()
+        clean_output = _ANSI_RE.sub('', out).strip()
         # The clean output should only contain "hello", not "world"
         assert "world" not in clean_output
 
-    def test_display_unicode_characters(self, capsys):
+    def test_display_unicode_characters(self):
         """Should display Unicode characters correctly."""
         state = DiffState("世界🌍", 3)
-        state.display_string()
-        captured = capsys.readouterr()
-        assert "世" in captured.out or len(captured.out) > 0
+        out = printed(state.display_string)
+        assert "世" in out or len(out) > 0
 
-    def test_display_control_characters(self, capsys):
+    def test_display_control_characters(self):
         """Should display control characters."""
         state = DiffState("hello\nworld\ttab", 15)
-        state.display_string()
-        captured = capsys.readouterr()
+        out = printed(state.display_string)
         # Should display without crashing
-        assert len(captured.out) > 0
+        assert len(out) > 0
 
 
 class TestRunDiffMode:
     """Tests for run_diff_mode function."""
 
-    def test_quit_immediately(self, capsys):
+    # Input scripts referenced by name below
+    _COMPLETE = ("5", "y", "y", "y", "y", "q")  # Complete, restart, quit
+    _ZERO = ("0", "q")
+    _EMPTY = ("5", "q")
+    _SKIP = ("3", "y", "y", "q")  # Mark first range as good, should skip
+
+    def test_quit_immediately(self, fake_input):
         """Should handle quit command."""
-        user_inputs = ["5", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
-        assert "Exiting diff mode" in captured.out
-
-    def test_match_response(self, capsys):
+        fake_input(("5", "y", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "Diff Mode" in out
+        assert "Exiting diff mode" in out
+
+    def test_match_response(self, fake_input):
         """Should handle matching range."""
-        user_inputs = ["5", "y", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
+        fake_input(("5", "y", "y", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "Diff Mode" in out
 
-    def test_no_match_response(self, capsys):
+    def test_no_match_response(self, fake_input):
         """Should handle non-matching range and split."""
-        user_inputs = ["5", "y", "n", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
-        assert "Range" in captured.out
-
-    def test_longer_phrase(self, capsys):
+        fake_input(("5", "y", "n", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "Diff Mode" in out
+        assert "Range" in out
+
+    def test_longer_phrase(self, fake_input):
         """Should handle request for longer phrase."""
-        user_inputs = ["5", "y", "l", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
+        fake_input(("5", "y", "l", "y", "q"))
+        out = printed(run_diff_mode, "hello")
         # The 'l' command should display a longer phrase (more words)
         # Split output into lines and find lines with phrases (contain hyphens)
-        lines = captured.out.split('\n')
+        lines = out.split('\n')
         phrase_lines = [line for line in lines if '-' in line and 'Range' in line]
         # Should have at least one phrase with more than 3 words (default is 3)
         # A longer phrase will have more hyphens
         has_longer_phrase = any(line.count('-') > 2 for line in phrase_lines)
         assert has_longer_phrase, "Should display a phrase with more than 3 words"
 
-    def test_restart_search(self, capsys):
+    def test_restart_search(self, fake_input):
         """Should handle restart command."""
-        user_inputs = ["5", "y", "r", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Restarting search" in captured.out
+        fake_input(("5", "y", "r", "y", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "Restarting search" in out
 
-    def test_use_default_length(self, capsys):
+    def test_use_default_length(self, fake_input):
         """Should use default length when Enter is pressed."""
-        user_inputs = ["", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "String length: 5" in captured.out
+        fake_input(("", "y", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "String length: 5" in out
 
-    def test_invalid_length_input(self, capsys):
+    def test_invalid_length_input(self, fake_input):
         """Should handle invalid length input gracefully."""
-        user_inputs = ["abc", "y", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Invalid length" in captured.out
+        fake_input(("abc", "y", "q"))
+        out = printed(run_diff_mode, "hello")
+        assert "Invalid length" in out
 
-    def test_length_mismatch_uses_dfs(self, capsys):
+    def test_length_mismatch_uses_dfs(self, fake_input):
         """Should use DFS when lengths don't match."""
-        user_inputs = ["10", "q"]  # Target longer than actual
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
+        fake_input(("10", "q"))  # Target longer than actual
+        out = printed(run_diff_mode, "hello")
+        assert "Diff Mode" in out
 
-    def test_search_completion(self, capsys):
+    def test_search_completion(self, fake_input):
         """Should handle search completion."""
-        user_inputs = ["5", "y", "y", "n"]  # Complete search, don't restart
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Search Complete" in captured.out
-        assert "No more ranges to check" in captured.out
-
-    def test_restart_after_completion(self, capsys):
-        """Should allow restart after completion."""
-        user_inputs = ["5", "y", "y", "y", "y", "q"]  # Complete, restart, quit
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Search Complete" in captured.out
-
-    def test_zero_target_length(self, capsys):
-        """Should handle target_length of 0."""
-        user_inputs = ["0", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("hello")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
-
-    def test_empty_user_string(self, capsys):
-        """Should handle empty user string."""
-        user_inputs = ["5", "q"]
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("")
-        captured = capsys.readouterr()
-        assert "Diff Mode" in captured.out
-
-    def test_skip_known_good_ranges(self, capsys):
+        fake_input(("5", "y", "y", "n"))  # Complete search, don't restart
+        out = printed(run_diff_mode, "hello")
+        assert "Search Complete" in out
+        assert "No more ranges to check" in out
+
+    @pytest.mark.parametrize("s,inputs,marker", [
+        pytest.param("hello", _COMPLETE, "Search Complete", id="restart_after_completion"),
+        pytest.param("hello", _ZERO, "Diff Mode", id="zero_target_length"),
+        pytest.param("", _EMPTY, "Diff Mode", id="empty_user_string"),
+    ])
+    def test_run_diff_mode_variants(self, fake_input, s, inputs, marker):
+        """Should reach the expected marker for each input script."""
+        fake_input(inputs)
+        assert marker in printed(run_diff_mode, s)
+
+    def test_skip_known_good_ranges(self, fake_input):
         """Should skip ranges that are already known-good."""
-        user_inputs = ["3", "y", "y", "q"]  # Mark first range as good, should skip
-        with patch('builtins.input', side_effect=user_inputs):
-            run_diff_mode("abc")
-        captured = capsys.readouterr()
+        fake_input(self._SKIP)
+        out = printed(run_diff_mode, "abc")
         # After marking the full range [0:3) as good, there should be no more ranges to check
         # The output should only show the initial range once, then complete
-        assert captured.out.count("Range [0:3)") == 1
-        assert "Search Complete" in captured.out or "No more ranges to check" in captured.out
+        assert _count_exactly_one(out, "Range [0:3)")
+        assert any(marker in out for marker in ("Search Complete", "No more ranges to check")), out
 
 
+@pytest.mark.usefixtures("bare_argv")
 class TestMain:
     """Tests for main function."""
 
-    def test_basic_flow(self, capsys):
-        """Should handle basic user flow."""
-        user_inputs = ["test string", "", "5", "y", "q"]
-        with patch('sys.argv', ['diffseek']):
-            with patch('builtins.input', side_effect=user_inputs):
-                try:
-                    main()
-                except (StopIteration, IndexError):
-                    # Input exhausted, that's OK
-                    pass
-        captured = capsys.readouterr()
-        assert "diffseek" in captured.out or "Diff Mode" in captured.out or "String identifiers:" in captured.out
-
-    def test_keyboard_interrupt_before_diff(self, capsys):
+    @pytest.mark.parametrize("user_inputs,expect", [
+        pytest.param(("test string", "", "5", "y", "q"), "diffseek", id="basic_flow"),
+        pytest.param(("hello", "", "5", "y", "q"), "String identifiers:", id="displays_identifiers"),
+        pytest.param(("", "", "0", "q"), "diffseek", id="empty_string_input"),
+        pytest.param(("Hello 世界 🌍", "", "5", "y", "q"), "String identifiers:", id="unicode_string_input"),
+        pytest.param((), "Exiting diff mode", id="padding_only"),
+    ])
+    def test_main_flow(self, run_main, user_inputs, expect):
+        """Should run the interactive flow for a variety of input strings."""
+        assert expect in run_main(user_inputs)
+
+    def test_keyboard_interrupt_before_diff(self, run_main):
         """Should handle Ctrl-C before diff mode."""
-        with patch('sys.argv', ['diffseek']):
-            with patch('builtins.input', side_effect=["test string", KeyboardInterrupt()]):
-                main()
-        captured = capsys.readouterr()
-        assert "Exiting" in captured.out
-
-    def test_displays_identifiers(self, capsys):
-        """Should display string identifiers."""
-        user_inputs = ["hello", "", "5", "y", "q"]
-        with patch('sys.argv', ['diffseek']):
-            with patch('builtins.input', side_effect=user_inputs):
-                try:
-                    main()
-                except (StopIteration, IndexError):
-                    # Input exhausted, that's OK
-                    pass
-        captured = capsys.readouterr()
-        assert "String identifiers:" in captured.out or "diffseek" in captured.out
-
-    def test_empty_string_input(self, capsys):
-        """Should handle empty string input."""
-        user_inputs = ["", "", "0", "q"]
-        with patch('sys.argv', ['diffseek']):
-            with patch('builtins.input', side_effect=user_inputs):
-                try:
-                    main()
-                except (StopIteration, IndexError):
-                    pass
-        captured = capsys.readouterr()
-        assert "diffseek" in captured.out or "String identifiers:" in captured.out
-
-    def test_unicode_string_input(self, capsys):
-        """Should handle Unicode string input."""
-        user_inputs = ["Hello 世界 🌍", "", "5", "y", "q"]
-        with patch('sys.argv', ['diffseek']):
-            with patch('builtins.input', side_effect=user_inputs):
-                try:
-                    main()
-                except (StopIteration, IndexError):
-                    pass
-        captured = capsys.readouterr()
-        assert "String identifiers:" in captured.out or "diffseek" in captured.out
+        assert "Exiting" in run_main(("test string", KeyboardInterrupt))
 
 
 if __name__ == "__main__":